@@ -0,0 +1,5 @@
+"""
+Shared Components
+
+Data preparation shared by the baseline and improved Merton models.
+"""
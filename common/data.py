@@ -0,0 +1,64 @@
+"""
+Market Data Preparation
+
+Load the equity, equity volatility, debt and risk-free inputs and align them
+into one row per firm-date, shared by the baseline and improved models.
+"""
+
+from pathlib import Path
+
+import polars as pl
+
+
+DATA_DIR = Path('data/real')
+
+
+def load_merged_market_data(data_dir=DATA_DIR):
+    """
+    Load and align all market data for calibration.
+    
+    Equity prices and volatilities are joined per firm-date, risk-free
+    rates per date, and quarterly debt is forward-filled with an as-of join.
+    
+    Parameters:
+    -----------
+    data_dir : str or Path
+        Directory containing the four input CSVs
+    
+    Returns:
+    --------
+    pl.DataFrame
+        Columns date, firm_id, equity_price, equity_vol, risk_free_rate and
+        debt, with incomplete rows dropped, sorted by (firm_id, date)
+    """
+    data_dir = Path(data_dir)
+    
+    equity_prices = pl.scan_csv(data_dir / 'equity_prices.csv', try_parse_dates=True)
+    equity_vol = pl.scan_csv(data_dir / 'equity_vol.csv', try_parse_dates=True)
+    debt = pl.scan_csv(data_dir / 'debt_quarterly.csv', try_parse_dates=True)
+    risk_free = pl.scan_csv(data_dir / 'risk_free.csv', try_parse_dates=True)
+
+    # Quarterly debt reports, sorted for the as-of joins below
+    debt = debt.select(['date', 'firm_id', 'debt']).sort('date')
+
+    # Merge market data, then forward-fill debt, in a single lazy query
+    return (
+        equity_prices
+        .join(equity_vol, on=['date', 'firm_id'], how='inner')
+        .join(risk_free, on='date', how='left')
+        .sort('date')
+        # Both sides are sorted globally by date, hence also within each firm_id
+        # group; Polars cannot verify that when 'by' is given, so skip the check
+        # Forward-fill debt: latest report on or before each date
+        .join_asof(debt, on='date', by='firm_id', strategy='backward', check_sortedness=False)
+        # Dates before a firm's first report fall back to that first report. This is
+        # deliberate look-ahead, bounded to reports published within 365 days
+        .join_asof(debt.rename({'debt': 'first_debt'}), on='date', by='firm_id', strategy='forward',
+                   tolerance='365d', check_sortedness=False)
+        .with_columns(pl.col('debt').fill_null(pl.col('first_debt')))
+        .drop('first_debt')
+        # Drop missing records
+        .drop_nulls(subset=['equity_price', 'equity_vol', 'debt', 'risk_free_rate'])
+        .sort(['firm_id', 'date'])
+        .collect()
+    )
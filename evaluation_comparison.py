@@ -4,7 +4,14 @@ Comparison script between naive and improved models.
 
 import pandas as pd
 import numpy as np
+import numpy_groupies as npg
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend; figures are rendered in worker processes
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Create outputs directory if it doesn't exist
@@ -13,12 +20,25 @@ Path('report').mkdir(exist_ok=True)
 
 def load_results():
     """Load results from both models."""
-    # NOTE: Updated filename to match what we generated earlier (baseline_results.csv)
-    naive = pd.read_csv('outputs/baseline_results.csv', parse_dates=['date'])
-    improved = pd.read_csv('outputs/improved_results.csv', parse_dates=['date'])
+    # NOTE: Updated filename to match what we generated earlier (baseline_results.parquet)
+    naive = pd.read_parquet('outputs/baseline_results.parquet')
+    improved = pd.read_parquet('outputs/improved_results.parquet')
     return naive, improved
 
 
+def aggregate_by_firm(df, column, func):
+    """
+    Aggregate a numeric column per firm with numpy_groupies.
+    
+    Matches pandas groupby semantics: firms sorted, NaNs skipped and
+    sample (ddof=1) standard deviation.
+    """
+    codes, firms = pd.factorize(df['firm_id'], sort=True)
+    kwargs = {'ddof': 1} if func == 'nanstd' else {}
+    values = npg.aggregate(codes, df[column].to_numpy(dtype=float), func=func, **kwargs)
+    return pd.Series(values, index=pd.Index(firms, name='firm_id'), name=column)
+
+
 def compare_time_series_stability(naive, improved):
     """
     Compare time-series stability of risk measures.
@@ -29,8 +49,8 @@ def compare_time_series_stability(naive, improved):
     print("="*60)
     
     # Group by firm and compute standard deviation of PD
-    naive_stability = naive.groupby('firm_id')['PD'].std()
-    improved_stability = improved.groupby('firm_id')['PD'].std()
+    naive_stability = aggregate_by_firm(naive, 'PD', 'nanstd')
+    improved_stability = aggregate_by_firm(improved, 'PD', 'nanstd')
     
     print("\nPD Standard Deviation (lower is more stable):")
     print(f"\nNaive Model:")
@@ -54,8 +74,8 @@ def compare_cross_sectional_ranking(naive, improved):
     print("="*60)
     
     # Get average PD per firm
-    naive_avg_pd = naive.groupby('firm_id')['PD'].mean().sort_values(ascending=False)
-    improved_avg_pd = improved.groupby('firm_id')['PD'].mean().sort_values(ascending=False)
+    naive_avg_pd = aggregate_by_firm(naive, 'PD', 'nanmean').sort_values(ascending=False)
+    improved_avg_pd = aggregate_by_firm(improved, 'PD', 'nanmean').sort_values(ascending=False)
     
     print("\nAverage PD by Firm (sorted, highest to lowest):")
     print(f"\nNaive Model (Values are unreasonably high):")
@@ -64,13 +84,34 @@ def compare_cross_sectional_ranking(naive, improved):
     print(improved_avg_pd)
 
 
-def plot_comparison(naive, improved, firm_id='AAPL'):
+def plot_pair(ax, naive_firm, improved_firm, column, labels):
     """
-    Plot time series comparison for a specific firm.
+    Draw the naive (red) and improved (green) series of one column.
+    
+    Both lines go into a single LineCollection, so each axes gets one
+    artist instead of one Line2D per series.
+    """
+    segments = [
+        np.column_stack([mdates.date2num(firm['date'].to_numpy()), firm[column].to_numpy(dtype=float)])
+        for firm in (naive_firm, improved_firm)
+    ]
+    ax.add_collection(LineCollection(segments, colors=['red', 'green'], alpha=0.7))
+    ax.xaxis_date()
+    ax.autoscale()
+    ax.legend(handles=[
+        Line2D([], [], color='red', alpha=0.7, label=labels[0]),
+        Line2D([], [], color='green', alpha=0.7, label=labels[1]),
+    ])
+
+
+def plot_comparison(naive_firm, improved_firm, firm_id='AAPL'):
     """
-    naive_firm = naive[naive['firm_id'] == firm_id].sort_values('date')
-    improved_firm = improved[improved['firm_id'] == firm_id].sort_values('date')
+    Plot time series comparison for a specific firm.
     
+    Takes the firm's rows already sliced out of each results frame and
+    sorted by date, so it can run in a worker process without shipping
+    or re-sorting the full frames.
+    """
     # Skip if no data
     if naive_firm.empty or improved_firm.empty:
         print(f"Skipping plot for {firm_id}: No data found.")
@@ -79,36 +120,28 @@ def plot_comparison(naive, improved, firm_id='AAPL'):
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     
     # 1. PD comparison (Log Scale because Improved PD is very small)
-    axes[0, 0].plot(naive_firm['date'], naive_firm['PD'], label='Naive (Unit Mismatch)', color='red', alpha=0.7)
-    axes[0, 0].plot(improved_firm['date'], improved_firm['PD'], label='Improved (Market Cap)', color='green', alpha=0.7)
+    plot_pair(axes[0, 0], naive_firm, improved_firm, 'PD', ('Naive (Unit Mismatch)', 'Improved (Market Cap)'))
     axes[0, 0].set_title(f'Default Probability (PD): {firm_id}')
     axes[0, 0].set_ylabel('PD (Log Scale)')
     axes[0, 0].set_yscale('log')  # CRITICAL CHANGE: Log scale to see small values
-    axes[0, 0].legend()
     axes[0, 0].grid(True, alpha=0.3)
     
     # 2. DD comparison
-    axes[0, 1].plot(naive_firm['date'], naive_firm['DD'], label='Naive', color='red', alpha=0.7)
-    axes[0, 1].plot(improved_firm['date'], improved_firm['DD'], label='Improved', color='green', alpha=0.7)
+    plot_pair(axes[0, 1], naive_firm, improved_firm, 'DD', ('Naive', 'Improved'))
     axes[0, 1].set_title(f'Distance-to-Default (DD): {firm_id}')
     axes[0, 1].set_ylabel('DD')
-    axes[0, 1].legend()
     axes[0, 1].grid(True, alpha=0.3)
     
     # 3. Asset volatility comparison
-    axes[1, 0].plot(naive_firm['date'], naive_firm['sigma_V'], label='Naive', color='red', alpha=0.7)
-    axes[1, 0].plot(improved_firm['date'], improved_firm['sigma_V'], label='Improved', color='green', alpha=0.7)
+    plot_pair(axes[1, 0], naive_firm, improved_firm, 'sigma_V', ('Naive', 'Improved'))
     axes[1, 0].set_title(f'Asset Volatility (sigma_V): {firm_id}')
     axes[1, 0].set_ylabel('Vol')
-    axes[1, 0].legend()
     axes[1, 0].grid(True, alpha=0.3)
     
     # 4. Asset value comparison
-    axes[1, 1].plot(naive_firm['date'], naive_firm['V'], label='Naive', color='red', alpha=0.7)
-    axes[1, 1].plot(improved_firm['date'], improved_firm['V'], label='Improved', color='green', alpha=0.7)
+    plot_pair(axes[1, 1], naive_firm, improved_firm, 'V', ('Naive', 'Improved'))
     axes[1, 1].set_title(f'Asset Value (V): {firm_id}')
     axes[1, 1].set_ylabel('Value ($)')
-    axes[1, 1].legend()
     axes[1, 1].grid(True, alpha=0.3)
     
     plt.tight_layout()
@@ -142,8 +175,18 @@ def main():
     firms = naive['firm_id'].unique()
     print(f"\nGenerating plots for firms: {firms}")
     
-    for firm in firms:
-        plot_comparison(naive, improved, firm_id=firm)
+    # Sort and slice each frame by firm once, then render the figures in parallel
+    naive_by_firm = dict(tuple(naive.sort_values('date').groupby('firm_id', sort=False)))
+    improved_by_firm = dict(tuple(improved.sort_values('date').groupby('firm_id', sort=False)))
+    no_rows = improved.iloc[:0]
+    
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(
+            plot_comparison,
+            [naive_by_firm[firm] for firm in firms],
+            [improved_by_firm.get(firm, no_rows) for firm in firms],
+            firms,
+        ))
     
     print("\n" + "="*60)
     print("Comparison complete! Check the 'report/' folder for images.")
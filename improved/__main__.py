@@ -6,15 +6,18 @@ Run with: python -m improved
 
 import sys
 import pandas as pd
+import polars as pl
 import numpy as np
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from improved.model import MertonModel
-from improved.calibration import calibrate_asset_parameters
-from improved.risk_measures import compute_risk_measures
+# The improved model only changes the equity input; the Merton machinery is shared
+from naive_model.model import MertonModel
+from naive_model.calibration import calibrate_asset_parameters_batch
+from naive_model.risk_measures import compute_risk_measures
+from common.data import DATA_DIR, load_merged_market_data
 
 
 def get_shares_outstanding():
@@ -31,72 +34,76 @@ def main():
     print("IMPROVED Merton Model")
     print("=" * 60)
     
-    data_dir = Path('data/real')
-    print(f"Loading data from {data_dir}...")
+    print(f"Loading data from {DATA_DIR}...")
 
     try:
-        equity_prices = pd.read_csv(data_dir / 'equity_prices.csv', parse_dates=['date'])
-        equity_vol = pd.read_csv(data_dir / 'equity_vol.csv', parse_dates=['date'])
-        debt = pd.read_csv(data_dir / 'debt_quarterly.csv', parse_dates=['date'])
-        risk_free = pd.read_csv(data_dir / 'risk_free.csv', parse_dates=['date'])
+        market_data = load_merged_market_data(DATA_DIR)
     except Exception as e:
         print(f"Error loading data: {e}")
         return
 
-    equity_prices['year'] = equity_prices['date'].dt.year
-    debt['year'] = debt['date'].dt.year
+    run(market_data)
 
-    df = pd.merge(equity_prices, equity_vol, on=['date', 'firm_id'], how='inner')
-    df = pd.merge(df, risk_free, on='date', how='left')
-    
-    debt_annual = debt[['firm_id', 'year', 'debt']].drop_duplicates()
-    df = pd.merge(df, debt_annual, on=['firm_id', 'year'], how='left')
-    
-    df = df.dropna(subset=['equity_price', 'equity_vol', 'debt', 'risk_free_rate'])
 
+def run(market_data):
+    """
+    Calibrate the improved model on merged market data and save the results.
+    
+    Parameters:
+    -----------
+    market_data : pl.DataFrame
+        Aligned firm-date rows from common.data.load_merged_market_data
+    """
     ## improve: Fix unit mismatch by calculating Market Cap (Price * Shares)
     shares_map = get_shares_outstanding()
-    df['shares'] = df['firm_id'].map(shares_map)
-    df['market_equity'] = df['equity_price'] * df['shares']
     
-    df = df.dropna(subset=['market_equity'])
+    df = (
+        market_data
+        .with_columns(
+            pl.col('firm_id')
+            .replace_strict(shares_map, default=None, return_dtype=pl.Float64)
+            .alias('shares')
+        )
+        .with_columns((pl.col('equity_price') * pl.col('shares')).alias('market_equity'))
+        .drop_nulls(subset=['market_equity'])
+    )
 
     print(f"Processing {len(df)} records...")
     
-    results = []
     T = 1.0
     
-    for row in df.itertuples():
-        ## improve: Use market_equity instead of share price
-        E = row.market_equity 
-        sigma_E = row.equity_vol
-        D = row.debt
-        r = row.risk_free_rate
-        
-        V, sigma_V = calibrate_asset_parameters(E, sigma_E, D, T, r)
-        
-        if np.isnan(V):
-            continue
-            
-        risk = compute_risk_measures(V, D, T, r, sigma_V)
-        
-        results.append({
-            'date': row.date,
-            'firm_id': row.firm_id,
-            'share_price': row.equity_price,
-            'market_cap': E,
-            'V': V,
-            'sigma_V': sigma_V,
-            'DD': risk['DD'],
-            'PD': risk['PD']
-        })
+    # Columnar extraction straight from the Arrow buffers
+    dates = df.get_column('date').to_numpy()
+    firms = df.get_column('firm_id').to_numpy()
+    share_price_arr = df.get_column('equity_price').to_numpy()
+    ## improve: Use market_equity instead of share price
+    E_arr = df.get_column('market_equity').to_numpy()
+    sigma_E_arr = df.get_column('equity_vol').to_numpy()
+    D_arr = df.get_column('debt').to_numpy()
+    r_arr = df.get_column('risk_free_rate').to_numpy()
+    
+    V_arr, sigma_V_arr = calibrate_asset_parameters_batch(
+        E_arr, sigma_E_arr, D_arr, T, r_arr, groups=firms
+    )
+    ok = ~np.isnan(V_arr)
+    
+    risk = compute_risk_measures(V_arr[ok], D_arr[ok], T, r_arr[ok], sigma_V_arr[ok])
     
     output_dir = Path('outputs')
     output_dir.mkdir(exist_ok=True)
     
-    results_df = pd.DataFrame(results)
-    output_file = output_dir / 'improved_results.csv'
-    results_df.to_csv(output_file, index=False)
+    results_df = pd.DataFrame({
+        'date': dates[ok],
+        'firm_id': firms[ok],
+        'share_price': share_price_arr[ok],
+        'market_cap': E_arr[ok],
+        'V': V_arr[ok],
+        'sigma_V': sigma_V_arr[ok],
+        'DD': risk['DD'],
+        'PD': risk['PD']
+    })
+    output_file = output_dir / 'improved_results.parquet'
+    results_df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
     
     print(f"\nResults saved to {output_file}")
     
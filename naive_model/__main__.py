@@ -13,74 +13,68 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from naive_model.model import MertonModel
-from naive_model.calibration import calibrate_asset_parameters
+from naive_model.calibration import calibrate_asset_parameters_batch
 from naive_model.risk_measures import compute_risk_measures
+from common.data import DATA_DIR, load_merged_market_data
 
 
 def main():
     print("Baseline Merton Model")
     print("=" * 60)
     
-    data_dir = Path('data/real')
-    print(f"Loading data from {data_dir}...")
+    print(f"Loading data from {DATA_DIR}...")
 
     try:
-        equity_prices = pd.read_csv(data_dir / 'equity_prices.csv', parse_dates=['date'])
-        equity_vol = pd.read_csv(data_dir / 'equity_vol.csv', parse_dates=['date'])
-        debt = pd.read_csv(data_dir / 'debt_quarterly.csv', parse_dates=['date'])
-        risk_free = pd.read_csv(data_dir / 'risk_free.csv', parse_dates=['date'])
+        df = load_merged_market_data(DATA_DIR)
     except Exception as e:
         print(f"Error loading data: {e}")
         return
 
-    # Extract year for data alignment
-    equity_prices['year'] = equity_prices['date'].dt.year
-    debt['year'] = debt['date'].dt.year
+    run(df)
 
-    # Merge market data
-    df = pd.merge(equity_prices, equity_vol, on=['date', 'firm_id'], how='inner')
-    df = pd.merge(df, risk_free, on='date', how='left')
-
-    # Merge debt by year
-    debt_annual = debt[['firm_id', 'year', 'debt']].drop_duplicates()
-    df = pd.merge(df, debt_annual, on=['firm_id', 'year'], how='left')
-
-    # Drop missing records
-    df = df.dropna(subset=['equity_price', 'equity_vol', 'debt', 'risk_free_rate'])
 
+def run(df):
+    """
+    Calibrate the baseline model on merged market data and save the results.
+    
+    Parameters:
+    -----------
+    df : pl.DataFrame
+        Aligned firm-date rows from common.data.load_merged_market_data
+    """
     print(f"Processing {len(df)} records...")
 
-    results = []
     T = 1.0
 
-    for row in df.itertuples():
-        E = row.equity_price
-        sigma_E = row.equity_vol
-        D = row.debt
-        r = row.risk_free_rate
-        
-        V, sigma_V = calibrate_asset_parameters(E, sigma_E, D, T, r)
-        
-        if np.isnan(V):
-            continue
-            
-        risk = compute_risk_measures(V, D, T, r, sigma_V)
-        
-        results.append({
-            'date': row.date,
-            'firm_id': row.firm_id,
-            'V': V,
-            'sigma_V': sigma_V,
-            'DD': risk['DD'],
-            'PD': risk['PD']
-        })
+    # Columnar extraction straight from the Arrow buffers
+    dates = df.get_column('date').to_numpy()
+    firms = df.get_column('firm_id').to_numpy()
+    E_arr = df.get_column('equity_price').to_numpy()
+    sigma_E_arr = df.get_column('equity_vol').to_numpy()
+    D_arr = df.get_column('debt').to_numpy()
+    r_arr = df.get_column('risk_free_rate').to_numpy()
+
+    # Calibrate all firm-dates in one pass, warm-starting along each firm's dates
+    V_arr, sigma_V_arr = calibrate_asset_parameters_batch(
+        E_arr, sigma_E_arr, D_arr, T, r_arr, groups=firms
+    )
+    ok = ~np.isnan(V_arr)
+
+    risk = compute_risk_measures(V_arr[ok], D_arr[ok], T, r_arr[ok], sigma_V_arr[ok])
     
     output_dir = Path('outputs')
     output_dir.mkdir(exist_ok=True)
     
-    results_df = pd.DataFrame(results)
-    output_file = output_dir / 'baseline_results.csv'
-    results_df.to_csv(output_file, index=False)
+    results_df = pd.DataFrame({
+        'date': dates[ok],
+        'firm_id': firms[ok],
+        'V': V_arr[ok],
+        'sigma_V': sigma_V_arr[ok],
+        'DD': risk['DD'],
+        'PD': risk['PD']
+    })
+    output_file = output_dir / 'baseline_results.parquet'
+    results_df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
     
     print(f"\nResults saved to {output_file}")
     
@@ -5,57 +5,372 @@ Calibrate unobservable asset value (V) and asset volatility (sigma_V)
 from observable equity value (E) and equity volatility (sigma_E).
 """
 
+import functools
+import math
+
 import numpy as np
-from scipy.optimize import fsolve
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy.optimize import brentq
+from scipy.special import ndtr
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional; the batch solver falls back to NumPy
+    _HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Fast-math flags minus 'nnan'/'ninf', so failed rows can still be flagged with NaN
+_FASTMATH = {'reassoc', 'contract', 'arcp', 'nsz', 'afn'}
+_SQRT1_2 = 0.7071067811865476
+_INV_SQRT_2PI = 0.3989422804014327
+
+# Initial-guess lookup table: bins over log(E / D) and sigma_E, plus the
+# representative risk-free rate used when sweeping it
+_GUESS_BINS = 32
+_GUESS_LOG_MONEYNESS = (-10.0, 5.0)
+_GUESS_SIGMA_E = (0.0, 2.0)
+_GUESS_RATE = 0.02
 
-from naive_model.model import black_scholes_call, black_scholes_delta
+# Rows each joblib worker needs before process startup pays for itself
+_MIN_ROWS_PER_JOB = 50_000
+
+
+def _norm_cdf(x):
+    """Standard normal CDF of a Python float via math.erf."""
+    return 0.5 * (1.0 + math.erf(x * _SQRT1_2))
 
 
 def calibrate_asset_parameters(E, sigma_E, D, T, r, V0=None, sigma_V0=None):
     """
     Calibrate asset value (V) and asset volatility (sigma_V) from equity data.
+    
+    The two-equation system is reduced to a 1D root find in sigma_V: for a
+    given sigma_V the equity equation pins V uniquely (the call price is
+    monotone in V), leaving only the equity volatility equation to solve.
+    Both levels use Brent's method on brackets that are guaranteed to
+    contain the root, so no initial guess or Jacobian is needed; V0 and
+    sigma_V0 are accepted for interface compatibility only.
     """
     
     if E <= 0 or sigma_E <= 0 or D <= 0 or T <= 0:
         return np.nan, np.nan
-
-    if V0 is None:
-        V0 = E + D
-    if sigma_V0 is None:
-        sigma_V0 = sigma_E * E / (E + D) if (E + D) > 0 else sigma_E
     
-    def equations(params):
-        """
-        System of equations to solve.
-        
-        Returns:
-        --------
-        list [eq1, eq2]
-            Residuals that should be zero at solution
-        """
-        V, sigma_V = params
-        
-        if V <= 0 or sigma_V <= 0:
-            return [1e6, 1e6]
-        
-        E_calc = black_scholes_call(V, D, T, r, sigma_V)
-        eq1 = E_calc - E
-        
-        delta = black_scholes_delta(V, D, T, r, sigma_V)
-        E_vol_calc = (delta * sigma_V * V) / E
-        eq2 = E_vol_calc - sigma_E
+    # Scalar inputs: math.* avoids NumPy's ufunc dispatch on every evaluation
+    sqrt_T = math.sqrt(T)
+    half_T = 0.5 * T
+    rT = r * T
+    discounted_D = D * math.exp(-rT)
+    
+    def d1_d2(V, sigma_V):
+        sigma_sqrt_T = sigma_V * sqrt_T
+        d1 = (math.log(V / D) + rT + half_T * sigma_V * sigma_V) / sigma_sqrt_T
+        return d1, d1 - sigma_sqrt_T
+    
+    def asset_value(sigma_V):
+        """Invert E = BlackScholes(V, D, T, r, sigma_V) for V."""
+        def equity_gap(V):
+            d1, d2 = d1_d2(V, sigma_V)
+            return V * _norm_cdf(d1) - discounted_D * _norm_cdf(d2) - E
         
-        return [eq1, eq2]
+        # V - D*e^(-rT) <= call <= V, so the gap is < 0 at V = E and >= E at 2E + D*e^(-rT)
+        return brentq(equity_gap, E, 2.0 * E + discounted_D)
+    
+    def volatility_gap(sigma_V):
+        """Residual of sigma_E * E = N(d1) * sigma_V * V with V implied by sigma_V."""
+        V = asset_value(sigma_V)
+        d1, _ = d1_d2(V, sigma_V)
+        return (V / E) * _norm_cdf(d1) * sigma_V - sigma_E
     
-    result, info, ier, msg = fsolve(
-        equations,
-        [V0, sigma_V0],
-        xtol=1e-6,
-        full_output=True
-    )
-    V, sigma_V = result
+    # N(d1) <= 1 and V <= E + D*e^(-rT) keep the gap negative at the lower end;
+    # V * N(d1) >= E keeps it non-negative at sigma_V = sigma_E
+    sigma_lo = 0.5 * sigma_E * E / (E + discounted_D)
+    
+    try:
+        sigma_V = brentq(volatility_gap, sigma_lo, sigma_E)
+        V = asset_value(sigma_V)
+    except (ValueError, RuntimeError):
+        return np.nan, np.nan
     
-    if ier != 1 or V <= 0 or sigma_V <= 0:
+    if not (V > 0 and sigma_V > 0):
         return np.nan, np.nan
     
     return V, sigma_V
+
+
+def calibrate_asset_parameters_batch(E, sigma_E, D, T, r, V0=None, sigma_V0=None,
+                                     groups=None, n_jobs=1, max_iter=25, tol=1e-6):
+    """
+    Calibrate asset value (V) and asset volatility (sigma_V) for many rows at once.
+
+    Runs up to max_iter 2D Newton steps per firm-date using the analytic
+    Jacobian of the Merton system and an explicit 2x2 inverse. Uses a
+    Numba-compiled kernel parallelized over rows when numba is installed,
+    otherwise vectorized NumPy passes over the whole batch.
+
+    Parameters:
+    -----------
+    E : array_like
+        Equity values
+    sigma_E : array_like
+        Equity volatilities
+    D : array_like
+        Debt face values
+    T : float
+        Time to maturity (in years)
+    r : array_like
+        Risk-free rates
+    V0, sigma_V0 : array_like, optional
+        Initial guesses (default: looked up from a precomputed table of
+        converged solutions, see _initial_guess)
+    groups : array_like, optional
+        Series labels (e.g. firm_id) for rows already sorted by date within
+        each label. Each row is then warm-started from the previous row's
+        solution in the same run, so adjacent dates converge in a couple of
+        steps. Only the compiled kernel uses warm starts.
+    n_jobs : int
+        Worker processes for the NumPy fallback (joblib convention, -1 = all
+        cores). Only used once every worker gets at least _MIN_ROWS_PER_JOB
+        rows. The compiled kernel already uses every core via prange.
+    max_iter : int
+        Maximum number of Newton iterations
+    tol : float
+        Relative step tolerance used to flag convergence
+
+    Returns:
+    --------
+    tuple (V, sigma_V)
+        Arrays of calibrated parameters; NaN where calibration failed
+    """
+    E, sigma_E, D, r = (np.ascontiguousarray(x, dtype=float)
+                        for x in np.broadcast_arrays(E, sigma_E, D, r))
+
+    if V0 is None or sigma_V0 is None:
+        V_guess, sigma_V_guess = _initial_guess(E, sigma_E, D, T, r)
+        V0 = V_guess if V0 is None else V0
+        sigma_V0 = sigma_V_guess if sigma_V0 is None else sigma_V0
+    V0 = np.ascontiguousarray(np.broadcast_to(V0, E.shape), dtype=float)
+    sigma_V0 = np.ascontiguousarray(np.broadcast_to(sigma_V0, E.shape), dtype=float)
+
+    if _HAVE_NUMBA:
+        n = E.shape[0]
+        if groups is None:
+            # Every row is its own run: fully row-parallel, no warm starts
+            starts = np.arange(n + 1)
+        else:
+            groups = np.asarray(groups)
+            breaks = np.flatnonzero(groups[1:] != groups[:-1]) + 1
+            starts = np.concatenate(([0], breaks, [n]))
+
+        V = np.empty(E.shape)
+        sigma_V = np.empty(E.shape)
+        _calibrate_batch_numba(E, sigma_E, D, float(T), r, V0, sigma_V0, starts,
+                               V, sigma_V, max_iter, tol)
+        return V, sigma_V
+
+    n_chunks = min(effective_n_jobs(n_jobs), E.shape[0] // _MIN_ROWS_PER_JOB)
+    if n_chunks > 1:
+        # Rows are independent without warm starts, so split into equal chunks;
+        # smaller batches stay serial, where worker startup would dominate
+        edges = np.linspace(0, E.shape[0], n_chunks + 1).astype(int)
+        chunks = [slice(lo, hi) for lo, hi in zip(edges[:-1], edges[1:])]
+        parts = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_calibrate_batch_numpy)(E[c], sigma_E[c], D[c], T, r[c], V0[c], sigma_V0[c],
+                                            max_iter, tol)
+            for c in chunks
+        )
+        V_parts, sigma_V_parts = zip(*parts)
+        return np.concatenate(V_parts), np.concatenate(sigma_V_parts)
+
+    return _calibrate_batch_numpy(E, sigma_E, D, T, r, V0, sigma_V0, max_iter, tol)
+
+
+def _reference_guess(E, sigma_E, D, T, r):
+    """
+    Leverage starting point against discounted debt:
+    V = E + D * e^(-rT), sigma_V = sigma_E * E / V.
+    
+    Highly levered rows (E << D) sit at V ~ E + D * e^(-rT), so corrections
+    relative to this reference do not depend on the rate.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        V_ref = E + D * np.exp(-r * T)
+        return V_ref, sigma_E * E / V_ref
+
+
+def _initial_guess(E, sigma_E, D, T, r):
+    """
+    O(1) Newton starting points from the lookup table.
+    
+    The table stores corrections to the discounted-leverage reference
+    (_reference_guess); rows outside the table range are clipped to the
+    edge bins, where the correction tends to 1.
+    """
+    V_ratio, sigma_ratio = _initial_guess_table(float(T))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_moneyness = np.nan_to_num(np.log(E / D))
+    V_ref, sigma_ref = _reference_guess(E, sigma_E, D, T, r)
+    
+    i = _guess_bin(log_moneyness, *_GUESS_LOG_MONEYNESS)
+    j = _guess_bin(np.nan_to_num(sigma_E), *_GUESS_SIGMA_E)
+    return V_ref * V_ratio[i, j], sigma_ref * sigma_ratio[i, j]
+
+
+def _guess_bin(x, lo, hi):
+    """Integer bin index of x on the lookup-table grid, clipped to the edges."""
+    k = _GUESS_BINS / (hi - lo)
+    return np.clip(np.floor((x - lo) * k), 0, _GUESS_BINS - 1).astype(int)
+
+
+@functools.lru_cache(maxsize=None)
+def _initial_guess_table(T):
+    """
+    Build the (V, sigma_V) correction tables for maturity T, once.
+    
+    Calibrates a cold-started sweep over the bin centres (D = 1, r =
+    _GUESS_RATE) and records V and sigma_V as ratios to _reference_guess.
+    Cells that fail to converge keep a ratio of 1, i.e. the plain reference.
+    """
+    def centres(lo, hi):
+        return lo + (np.arange(_GUESS_BINS) + 0.5) * (hi - lo) / _GUESS_BINS
+    
+    log_moneyness, sigma_E = np.meshgrid(centres(*_GUESS_LOG_MONEYNESS),
+                                         centres(*_GUESS_SIGMA_E), indexing='ij')
+    E = np.exp(log_moneyness).ravel()
+    sigma_E = sigma_E.ravel()
+    D = np.ones_like(E)
+    r = np.full_like(E, _GUESS_RATE)
+    
+    V_ref, sigma_ref = _reference_guess(E, sigma_E, D, T, r)
+    V, sigma_V = _calibrate_batch_numpy(E, sigma_E, D, T, r, E + D, sigma_E * E / (E + D),
+                                        max_iter=50, tol=1e-10)
+    
+    shape = (_GUESS_BINS, _GUESS_BINS)
+    V_ratio = np.nan_to_num(V / V_ref, nan=1.0).reshape(shape)
+    sigma_ratio = np.nan_to_num(sigma_V / sigma_ref, nan=1.0).reshape(shape)
+    return V_ratio, sigma_ratio
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _calibrate_batch_numba(E, sigma_E, D, T, r, V0, sigma_V0, starts, V_out, sigma_V_out,
+                           max_iter, tol):
+    """Compiled solver: runs in parallel, rows within a run solved in order."""
+    for k in prange(starts.shape[0] - 1):
+        warm = False
+        for i in range(starts[k], starts[k + 1]):
+            V_out[i] = np.nan
+            sigma_V_out[i] = np.nan
+            if E[i] > 0 and sigma_E[i] > 0 and D[i] > 0 and T > 0:
+                V, sigma_V, ok = V0[i], sigma_V0[i], False
+                if warm:
+                    V, sigma_V, ok = _newton_solve(E[i], sigma_E[i], D[i], T, r[i],
+                                                   V_out[i - 1], sigma_V_out[i - 1], max_iter, tol)
+                if not ok:
+                    # Cold start, also used as the retry when a warm start fails
+                    V, sigma_V, ok = _newton_solve(E[i], sigma_E[i], D[i], T, r[i],
+                                                   V0[i], sigma_V0[i], max_iter, tol)
+                if ok:
+                    V_out[i] = V
+                    sigma_V_out[i] = sigma_V
+                warm = ok
+            else:
+                warm = False
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _newton_solve(E, sigma_E, D, T, r, V, sigma_V, max_iter, tol):
+    """2D Newton iteration for a single firm-date; returns (V, sigma_V, converged)."""
+    sqrt_T = math.sqrt(T)
+    disc = D * math.exp(-r * T)
+    for _ in range(max_iter):
+        sv = sigma_V * sqrt_T
+        d1 = (math.log(V / D) + (r + 0.5 * sigma_V * sigma_V) * T) / sv
+        d2 = d1 - sv
+        Nd1 = 0.5 * (1.0 + math.erf(d1 * _SQRT1_2))
+        Nd2 = 0.5 * (1.0 + math.erf(d2 * _SQRT1_2))
+        phi_d1 = math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+
+        f1 = V * Nd1 - disc * Nd2 - E
+        f2 = (V / E) * Nd1 * sigma_V - sigma_E
+
+        j11 = Nd1
+        j12 = V * phi_d1 * sqrt_T
+        j21 = (sigma_V / E) * (Nd1 + phi_d1 / sv)
+        j22 = (V / E) * (Nd1 - phi_d1 * d2)
+
+        det = j11 * j22 - j12 * j21
+        if det == 0.0:
+            break
+        V_new = V - (j22 * f1 - j12 * f2) / det
+        sigma_new = sigma_V - (j11 * f2 - j21 * f1) / det
+        if not V_new > 0:
+            V_new = 0.5 * V
+        if not sigma_new > 0:
+            sigma_new = 0.5 * sigma_V
+
+        converged = (abs(V_new - V) <= tol * abs(V_new)
+                     and abs(sigma_new - sigma_V) <= tol * abs(sigma_new))
+        V = V_new
+        sigma_V = sigma_new
+        if converged:
+            return V, sigma_V, math.isfinite(V) and math.isfinite(sigma_V)
+    return V, sigma_V, False
+
+
+def _calibrate_batch_numpy(E, sigma_E, D, T, r, V0, sigma_V0, max_iter, tol):
+    """Vectorized Newton solver over the whole batch (fallback without numba)."""
+    valid = (E > 0) & (sigma_E > 0) & (D > 0) & (T > 0)
+    V = np.where(valid, V0, 1.0)
+    sigma_V = np.where(valid, sigma_V0, 1.0)
+
+    # With T = 1 the sqrt(T) and T factors drop out of every pass
+    unit_T = T == 1.0
+    sqrt_T = np.sqrt(T)
+    rT = r if unit_T else r * T
+    half_T = 0.5 * T
+    disc = D * np.exp(-rT)
+    converged = np.zeros(E.shape, dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            sv = sigma_V if unit_T else sigma_V * sqrt_T
+            d1 = (np.log(V / D) + rT + half_T * sigma_V**2) / sv
+            d2 = d1 - sv
+            Nd1 = ndtr(d1)
+            Nd2 = ndtr(d2)
+            phi_d1 = np.exp(-0.5 * d1**2) * _INV_SQRT_2PI
+
+            # Residuals of the equity value and equity volatility equations
+            f1 = V * Nd1 - disc * Nd2 - E
+            f2 = (V / E) * Nd1 * sigma_V - sigma_E
+
+            # Analytic Jacobian: dd1/dV = 1 / (V * sigma_V * sqrt(T)), dd1/dsigma_V = -d2 / sigma_V
+            j11 = Nd1
+            j12 = V * phi_d1 if unit_T else V * phi_d1 * sqrt_T
+            j21 = (sigma_V / E) * (Nd1 + phi_d1 / sv)
+            j22 = (V / E) * (Nd1 - phi_d1 * d2)
+
+            # Explicit 2x2 inverse (cofactor formula)
+            det = j11 * j22 - j12 * j21
+            dV = (j22 * f1 - j12 * f2) / det
+            dsigma = (j11 * f2 - j21 * f1) / det
+
+            V_new = V - dV
+            sigma_new = sigma_V - dsigma
+            # Keep iterates in the feasible region by halving towards zero
+            V_new = np.where(V_new > 0, V_new, 0.5 * V)
+            sigma_new = np.where(sigma_new > 0, sigma_new, 0.5 * sigma_V)
+
+            converged = (np.abs(V_new - V) <= tol * np.abs(V_new)) & \
+                        (np.abs(sigma_new - sigma_V) <= tol * np.abs(sigma_new))
+            V, sigma_V = V_new, sigma_new
+
+            if converged[valid].all():
+                break
+
+    ok = valid & converged & np.isfinite(V) & np.isfinite(sigma_V)
+    return np.where(ok, V, np.nan), np.where(ok, sigma_V, np.nan)
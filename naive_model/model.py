@@ -5,7 +5,27 @@ Implement the baseline Merton (1974) model here.
 """
 
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+
+
+def _bs_core(S, K, T, r, sigma):
+    """
+    Shared Black-Scholes terms, computed once per evaluation.
+    
+    Returns:
+    --------
+    tuple (d1, d2, discount)
+        d1, d2 = d1 - sigma * sqrt(T), and the discount factor e^(-rT)
+    """
+    sigma_sqrt_T = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sigma_sqrt_T
+    return d1, d1 - sigma_sqrt_T, np.exp(-r * T)
+
+
+def _bs_core_T1(S, K, r, sigma):
+    """_bs_core specialized to T = 1: sqrt(T) and the T factors drop out."""
+    d1 = (np.log(S / K) + r + 0.5 * sigma**2) / sigma
+    return d1, d1 - sigma, np.exp(-r)
 
 
 def black_scholes_call(S, K, T, r, sigma):
@@ -30,12 +50,11 @@ def black_scholes_call(S, K, T, r, sigma):
     float
         Call option price
     """
-    # Calculate d1 and d2
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
+    # Calculate d1, d2 and the discount factor
+    d1, d2, discount = _bs_core(S, K, T, r, sigma)
     
     # Return Call Price: S * N(d1) - K * e^(-rT) * N(d2)
-    return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    return S * ndtr(d1) - K * discount * ndtr(d2)
 
 
 def black_scholes_delta(S, K, T, r, sigma):
@@ -64,10 +83,22 @@ def black_scholes_delta(S, K, T, r, sigma):
         Delta of the call option (between 0 and 1)
     """
     # Calculate d1
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+    d1, _, _ = _bs_core(S, K, T, r, sigma)
     
     # Return Delta: N(d1)
-    return norm.cdf(d1)
+    return ndtr(d1)
+
+
+def _black_scholes_call_T1(S, K, r, sigma):
+    """Black-Scholes call price specialized to a one-year maturity (T = 1)."""
+    d1, d2, discount = _bs_core_T1(S, K, r, sigma)
+    return S * ndtr(d1) - K * discount * ndtr(d2)
+
+
+def _black_scholes_delta_T1(S, K, r, sigma):
+    """Black-Scholes call delta specialized to a one-year maturity (T = 1)."""
+    d1, _, _ = _bs_core_T1(S, K, r, sigma)
+    return ndtr(d1)
 
 
 class MertonModel:
@@ -112,6 +143,8 @@ class MertonModel:
             Equity value
         """
         # Equity is a call option on Assets (V) with strike Debt (D)
+        if self.T == 1.0:
+            return _black_scholes_call_T1(V, D, r, sigma_V)
         return black_scholes_call(V, D, self.T, r, sigma_V)
     
     def equity_volatility(self, V, D, r, sigma_V, E):
@@ -137,7 +170,10 @@ class MertonModel:
             Equity volatility
         """
         # Calculate Delta (∂E/∂V)
-        delta = black_scholes_delta(V, D, self.T, r, sigma_V)
+        if self.T == 1.0:
+            delta = _black_scholes_delta_T1(V, D, r, sigma_V)
+        else:
+            delta = black_scholes_delta(V, D, self.T, r, sigma_V)
         
         # Formula: sigma_E = (V / E) * Delta * sigma_V
         return (V / E) * delta * sigma_V
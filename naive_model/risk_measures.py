@@ -5,7 +5,7 @@ Compute credit risk measures from calibrated asset parameters.
 """
 
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
 
 
 def distance_to_default(V, D, T, r, sigma_V):
@@ -40,11 +40,26 @@ def distance_to_default(V, D, T, r, sigma_V):
     expected_asset_value = V * np.exp(r * T)
     std_asset_value = expected_asset_value * np.sqrt(np.exp(sigma_V**2 * T) - 1)
     
-    # Avoid division by zero
-    if std_asset_value < 1e-8:
-        return np.inf if expected_asset_value > D else -np.inf
-        
-    return (expected_asset_value - D) / std_asset_value
+    return _standardized_distance(expected_asset_value, std_asset_value, D)
+
+
+def _distance_to_default_T1(V, D, r, sigma_V):
+    """distance_to_default specialized to a one-year horizon (T = 1)."""
+    expected_asset_value = V * np.exp(r)
+    std_asset_value = expected_asset_value * np.sqrt(np.exp(sigma_V**2) - 1)
+    
+    return _standardized_distance(expected_asset_value, std_asset_value, D)
+
+
+def _standardized_distance(expected_asset_value, std_asset_value, D):
+    """(E[V_T] - D) / std(V_T), guarding against a vanishing std."""
+    # Avoid division by zero (elementwise, so arrays of firm-dates work too)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd = (expected_asset_value - D) / std_asset_value
+    degenerate = np.where(expected_asset_value > D, np.inf, -np.inf)
+    
+    # [()] unwraps the 0-d result for scalar inputs
+    return np.where(std_asset_value < 1e-8, degenerate, dd)[()]
 
 
 def default_probability(V, D, T, r, sigma_V):
@@ -78,7 +93,14 @@ def default_probability(V, D, T, r, sigma_V):
     
     d2 = numerator / denominator
     
-    return norm.cdf(-d2)
+    return ndtr(-d2)
+
+
+def _default_probability_T1(V, D, r, sigma_V):
+    """default_probability specialized to a one-year horizon (T = 1)."""
+    d2 = (np.log(V / D) + r - 0.5 * sigma_V**2) / sigma_V
+    
+    return ndtr(-d2)
 
 
 def compute_risk_measures(V, D, T, r, sigma_V):
@@ -103,8 +125,12 @@ def compute_risk_measures(V, D, T, r, sigma_V):
     dict
         Dictionary with 'DD' and 'PD' keys
     """
-    DD = distance_to_default(V, D, T, r, sigma_V)
-    PD = default_probability(V, D, T, r, sigma_V)
+    if T == 1.0:
+        DD = _distance_to_default_T1(V, D, r, sigma_V)
+        PD = _default_probability_T1(V, D, r, sigma_V)
+    else:
+        DD = distance_to_default(V, D, T, r, sigma_V)
+        PD = default_probability(V, D, T, r, sigma_V)
     
     return {
         'DD': DD,
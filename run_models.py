@@ -0,0 +1,26 @@
+"""
+Run the baseline and improved Merton models on a single data load.
+
+Run with: python run_models.py
+"""
+
+from common.data import DATA_DIR, load_merged_market_data
+from naive_model.__main__ import run as run_baseline
+from improved.__main__ import run as run_improved
+
+
+def main():
+    print(f"Loading data from {DATA_DIR}...")
+    market_data = load_merged_market_data(DATA_DIR)
+
+    print("\nBaseline Merton Model")
+    print("=" * 60)
+    run_baseline(market_data)
+
+    print("\nIMPROVED Merton Model")
+    print("=" * 60)
+    run_improved(market_data)
+
+
+if __name__ == "__main__":
+    main()